@@ -10,6 +10,7 @@ from integral_tool.integral import (
     fresnel_hologram,
     fresnel_hologram_scipy,
     fresnel_hologram_cpp,
+    fresnel_hologram_numba,
     amplitude_phase,
 )
 from integral_tool.io import load_points_from_obj
@@ -49,6 +50,8 @@ def process_hologram(obj_file, method):
         U = fresnel_hologram_scipy(points, amplitude, grid, grid)
     elif method == "cpp":
         U = fresnel_hologram_cpp(points, amplitude, grid, grid)
+    elif method == "numba":
+        U = fresnel_hologram_numba(points, amplitude, grid, grid)
     else:
         raise gr.Error(f"Unknown method: {method}")
     
@@ -73,7 +76,7 @@ with gr.Blocks() as demo:
         with gr.Column(scale=1):
             obj_input = gr.File(label=".obj File", file_types=[".obj"])
             method_input = gr.Radio(
-                ["python", "scipy", "cpp"], label="Computation Method", value="cpp"
+                ["python", "scipy", "cpp", "numba"], label="Computation Method", value="cpp"
             )
             submit_btn = gr.Button("Generate Hologram")
         
@@ -30,6 +30,8 @@ a = Analysis(
         'integral_tool.cpp_integral_impl', # 确保 cppimport 模块被发现
         'matplotlib.backends.backend_agg', # Gradio web app might use agg backend
         'scipy.special._ufuncs_cxx', # Sometimes scipy needs this for C++ extensions
+        'numba', # 可选的 numba 方法
+        'integral_tool.numba_impl',
     ],
     hookspath=[],
     hooksconfig={},
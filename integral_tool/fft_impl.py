@@ -0,0 +1,450 @@
+"""FFT based propagators for planar sources."""
+
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional, Tuple
+import warnings
+
+from .quadrature_impl import weighted_surface_sum
+
+# Default tolerance (radians) on the phase neglected by an approximation.
+# pi/8 corresponds to the classical Fraunhofer distance z = 2 D^2 / lambda.
+MAX_PHASE_ERROR = np.pi / 8
+
+# Energy fraction per axis of the field, and of its spectrum, left out of the
+# region on which the phase errors are estimated.
+SUPPORT_FRACTION = 1e-2
+
+
+def _check_source_grid(U_s, grid_x_s, grid_y_s, wavelength, z0):
+    if wavelength == 0:
+        raise ValueError("Wavelength cannot be zero.")
+    if z0 == 0:
+        raise ValueError("Propagation distance z0 cannot be zero.")
+    if grid_x_s.ndim != 1 or grid_y_s.ndim != 1:
+        raise ValueError("Source grids grid_x_s and grid_y_s must be 1-dimensional.")
+    if U_s.shape != (len(grid_x_s), len(grid_y_s)):
+        raise ValueError("U_s shape must match the dimensions of grid_x_s and grid_y_s.")
+    if len(grid_x_s) < 2 or len(grid_y_s) < 2:
+        raise ValueError("Source grids must contain at least two samples.")
+
+    dx = np.mean(np.diff(grid_x_s))
+    dy = np.mean(np.diff(grid_y_s))
+    if not np.allclose(np.diff(grid_x_s), dx) or not np.allclose(np.diff(grid_y_s), dy):
+        raise ValueError("FFT propagation requires evenly spaced source grids.")
+    return dx, dy
+
+
+def fft_output_grid(
+    grid_s: NDArray[np.float64],
+    wavelength: float,
+    z0: float
+) -> NDArray[np.float64]:
+    """Observation coordinates produced by a single-FFT transform.
+
+    Parameters
+    ----------
+    grid_s : NDArray
+        Evenly spaced 1-D source coordinates.
+    wavelength : float
+        Wavelength of the wave.
+    z0 : float
+        Propagation distance.
+
+    Returns
+    -------
+    NDArray
+        1-D array of ``len(grid_s)`` observation coordinates with spacing
+        ``wavelength * |z0| / (len(grid_s) * dx)``, centred on the optical axis.
+    """
+    n = len(grid_s)
+    dx = np.mean(np.diff(grid_s))
+    du = wavelength * abs(z0) / (n * dx)
+    return (np.arange(n) - n // 2) * du
+
+
+def _energy_bounds(energy, coords, fraction):
+    """Smallest coordinate interval holding all but ``fraction`` of a 1-D energy profile."""
+    cdf = np.cumsum(energy)
+    total = cdf[-1]
+    if total <= 0:
+        return coords[0], coords[-1]
+    lo = np.searchsorted(cdf, fraction / 2 * total, side="right")
+    hi = np.searchsorted(cdf, (1 - fraction / 2) * total, side="left")
+    return coords[lo], coords[min(hi, len(coords) - 1)]
+
+
+def field_support(
+    U_s: NDArray[np.complex128],
+    grid_x_s: NDArray[np.float64],
+    grid_y_s: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    fraction: float = SUPPORT_FRACTION
+):
+    """Region of the source plane holding the field and the region it reaches.
+
+    Parameters
+    ----------
+    U_s : NDArray (Nx_s, Ny_s)
+        Complex field on the evenly spaced source grid.
+    grid_x_s, grid_y_s : NDArray
+        1-D source coordinates.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Propagation distance. Defaults to 0.1.
+    fraction : float, optional
+        Energy fraction per axis allowed outside each region. Defaults to
+        ``SUPPORT_FRACTION``.
+
+    Returns
+    -------
+    Tuple[Tuple[float, float, float, float], Tuple[float, float, float, float]]
+        Bounds ``(x_min, x_max, y_min, y_max)`` of the source support and of
+        the observation region reached by the field. A plane wave of spatial
+        frequency ``f`` travels ``wavelength * z0 * f`` sideways, so the
+        reached region is the support widened by the band of the spectrum.
+    """
+    energy = np.abs(U_s) ** 2
+    x0, x1 = _energy_bounds(energy.sum(axis=1), grid_x_s, fraction)
+    y0, y1 = _energy_bounds(energy.sum(axis=0), grid_y_s, fraction)
+
+    spectrum = np.abs(np.fft.fftshift(np.fft.fft2(U_s))) ** 2
+    fx = np.fft.fftshift(np.fft.fftfreq(len(grid_x_s), d=np.mean(np.diff(grid_x_s))))
+    fy = np.fft.fftshift(np.fft.fftfreq(len(grid_y_s), d=np.mean(np.diff(grid_y_s))))
+    shifts_x = wavelength * z0 * np.array(_energy_bounds(spectrum.sum(axis=1), fx, fraction))
+    shifts_y = wavelength * z0 * np.array(_energy_bounds(spectrum.sum(axis=0), fy, fraction))
+    reach = (x0 + shifts_x.min(), x1 + shifts_x.max(), y0 + shifts_y.min(), y1 + shifts_y.max())
+    return (x0, x1, y0, y1), reach
+
+
+def fresnel_number(
+    grid_x_s: NDArray[np.float64],
+    grid_y_s: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    U_s: Optional[NDArray[np.complex128]] = None
+) -> float:
+    """Fresnel number ``a^2 / (lambda z)`` of the source aperture.
+
+    ``a`` is the largest distance of a source sample from the optical axis,
+    restricted to the :func:`field_support` of ``U_s`` if it is given.
+    Fraunhofer propagation is only accurate for Fresnel numbers well below one.
+    """
+    if U_s is not None:
+        (x0, x1, y0, y1), _ = field_support(U_s, grid_x_s, grid_y_s, wavelength, z0)
+        grid_x_s, grid_y_s = np.array([x0, x1]), np.array([y0, y1])
+    a_sq = np.max(np.abs(grid_x_s)) ** 2 + np.max(np.abs(grid_y_s)) ** 2
+    return float(a_sq / (wavelength * abs(z0)))
+
+
+def paraxial_phase_error(
+    grid_x_s: NDArray[np.float64],
+    grid_y_s: NDArray[np.float64],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    U_s: Optional[NDArray[np.complex128]] = None
+) -> float:
+    """Upper bound on the phase neglected by the Fresnel approximation.
+
+    The first term dropped from the binomial expansion of ``k R`` is
+    ``k rho^4 / (8 z^3)``, with ``rho`` the largest transverse distance
+    between a source and an observation sample. If ``U_s`` is given, only
+    its :func:`field_support` and the part of the observation grid its band
+    reaches are considered. Otherwise the full windows are used, which
+    overestimates the error of any field that does not fill them.
+
+    Returns
+    -------
+    float
+        Estimated maximum phase error in radians.
+    """
+    if U_s is not None:
+        (x0, x1, y0, y1), (u0, u1, v0, v1) = field_support(U_s, grid_x_s, grid_y_s, wavelength, z0)
+        grid_x_s, grid_y_s = np.array([x0, x1]), np.array([y0, y1])
+        grid_x = np.clip([u0, u1], np.min(grid_x), np.max(grid_x))
+        grid_y = np.clip([v0, v1], np.min(grid_y), np.max(grid_y))
+    rho_x = max(abs(np.max(grid_x) - np.min(grid_x_s)), abs(np.max(grid_x_s) - np.min(grid_x)))
+    rho_y = max(abs(np.max(grid_y) - np.min(grid_y_s)), abs(np.max(grid_y_s) - np.min(grid_y)))
+    rho_sq = rho_x ** 2 + rho_y ** 2
+    return float(np.pi * rho_sq ** 2 / (4 * wavelength * abs(z0) ** 3))
+
+
+def fraunhofer_phase_error(
+    grid_x_s: NDArray[np.float64],
+    grid_y_s: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    U_s: Optional[NDArray[np.complex128]] = None
+) -> float:
+    """Upper bound on the quadratic source phase neglected by the Fraunhofer approximation.
+
+    Returns
+    -------
+    float
+        ``pi * N_F`` in radians, where ``N_F`` is the :func:`fresnel_number`.
+    """
+    return np.pi * fresnel_number(grid_x_s, grid_y_s, wavelength, z0, U_s)
+
+
+def _single_fft_transform(U_s, grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, dx, dy, source_chirp):
+    k = 2 * np.pi / wavelength
+    lz = wavelength * z0
+
+    f = U_s.astype(np.complex128, copy=True)
+    if source_chirp:
+        xs, ys = np.meshgrid(grid_x_s, grid_y_s, indexing="ij")
+        f *= np.exp(1j * np.pi * (xs ** 2 + ys ** 2) / lz)
+
+    if z0 > 0:
+        F = np.fft.fftshift(np.fft.fft2(f))
+    else:
+        # Backward propagation flips the sign of the kernel exponent.
+        F = np.fft.fftshift(np.fft.ifft2(f)) * f.size
+    # The DFT assumes the source starts at x'=0; shift to the real origin.
+    F *= np.exp(-2j * np.pi * grid_x[:, np.newaxis] * grid_x_s[0] / lz)
+    F *= np.exp(-2j * np.pi * grid_y[np.newaxis, :] * grid_y_s[0] / lz)
+
+    x_obs, y_obs = np.meshgrid(grid_x, grid_y, indexing="ij")
+    prefactor = np.exp(1j * k * z0) / (1j * lz) * np.exp(1j * np.pi * (x_obs ** 2 + y_obs ** 2) / lz)
+    U = prefactor * F * dx * dy
+    return U, grid_x, grid_y
+
+
+def _exact_transform(U_s, grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, dx, dy):
+    # Rectangle rule of surface_huygens_fresnel, evaluated in bounded tiles
+    U = weighted_surface_sum(U_s * (dx * dy), grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0)
+    return U, grid_x, grid_y
+
+
+def _handle_invalid(name, error, max_phase_error, fallback):
+    if error <= max_phase_error:
+        return False
+    if fallback:
+        warnings.warn(
+            f"{name} approximation phase error {error:.3g} rad exceeds {max_phase_error:.3g} rad; "
+            "falling back to the exact surface integral.",
+            RuntimeWarning,
+        )
+        return True
+    warnings.warn(
+        f"{name} approximation phase error {error:.3g} rad exceeds {max_phase_error:.3g} rad; "
+        "the result may be inaccurate.",
+        RuntimeWarning,
+    )
+    return False
+
+
+def fresnel_propagate(
+    U_s: NDArray[np.complex128],
+    grid_x_s: NDArray[np.float64],
+    grid_y_s: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    max_phase_error: float = MAX_PHASE_ERROR,
+    fallback: bool = False
+) -> Tuple[NDArray[np.complex128], NDArray[np.float64], NDArray[np.float64]]:
+    """Propagate a planar field with the single-FFT Fresnel transform.
+
+    Parameters
+    ----------
+    U_s : NDArray (Nx_s, Ny_s)
+        Complex field ``U_s(x', y')`` defined on the source plane ``z=0``.
+    grid_x_s : NDArray
+        Evenly spaced 1-D x-coordinates ``x'`` of ``U_s``.
+    grid_y_s : NDArray
+        Evenly spaced 1-D y-coordinates ``y'`` of ``U_s``.
+    wavelength : float, optional
+        Wavelength :math:`\\lambda` of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Distance between the source and observation planes. Defaults to 0.1.
+    max_phase_error : float, optional
+        Tolerated :func:`paraxial_phase_error` in radians, estimated on the
+        :func:`field_support` of ``U_s``. Defaults to pi/8.
+    fallback : bool, optional
+        If True and the tolerance is exceeded, evaluate the exact
+        :func:`surface_huygens_fresnel` integral on the same output grid
+        instead of only issuing a warning. The integral is summed over tiles
+        of observation pixels, so memory stays bounded, but its cost is
+        O(M^2) for M source samples. Defaults to False.
+
+    Returns
+    -------
+    Tuple[NDArray, NDArray, NDArray]
+        Tuple containing:
+        - Complex field ``U(x, y)`` of shape (Nx_s, Ny_s).
+        - Observation x-coordinates, spacing ``lambda z0 / (Nx_s dx')``.
+        - Observation y-coordinates, spacing ``lambda z0 / (Ny_s dy')``.
+
+    Raises
+    ------
+    ValueError
+        If wavelength or z0 is zero, or the source grid is not evenly spaced
+        or does not match ``U_s``.
+    RuntimeWarning
+        If the estimated paraxial phase error exceeds ``max_phase_error``.
+
+    Notes
+    -----
+    The cost is a single 2-D FFT, O(M log M) for M source samples, compared
+    with O(M^2) for the direct surface integral.
+    """
+    dx, dy = _check_source_grid(U_s, grid_x_s, grid_y_s, wavelength, z0)
+    grid_x = fft_output_grid(grid_x_s, wavelength, z0)
+    grid_y = fft_output_grid(grid_y_s, wavelength, z0)
+
+    error = paraxial_phase_error(grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, U_s)
+    if _handle_invalid("Fresnel", error, max_phase_error, fallback):
+        return _exact_transform(U_s, grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, dx, dy)
+
+    return _single_fft_transform(
+        U_s, grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, dx, dy, source_chirp=True
+    )
+
+
+def fraunhofer_propagate(
+    U_s: NDArray[np.complex128],
+    grid_x_s: NDArray[np.float64],
+    grid_y_s: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    max_phase_error: float = MAX_PHASE_ERROR,
+    fallback: bool = False
+) -> Tuple[NDArray[np.complex128], NDArray[np.float64], NDArray[np.float64]]:
+    """Propagate a planar field to the far field with the Fraunhofer transform.
+
+    Identical to :func:`fresnel_propagate` except that the quadratic phase
+    across the source is dropped, which is valid for Fresnel numbers well
+    below one.
+
+    Parameters
+    ----------
+    U_s : NDArray (Nx_s, Ny_s)
+        Complex field ``U_s(x', y')`` defined on the source plane ``z=0``.
+    grid_x_s : NDArray
+        Evenly spaced 1-D x-coordinates ``x'`` of ``U_s``.
+    grid_y_s : NDArray
+        Evenly spaced 1-D y-coordinates ``y'`` of ``U_s``.
+    wavelength : float, optional
+        Wavelength :math:`\\lambda` of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Distance between the source and observation planes. Defaults to 0.1.
+    max_phase_error : float, optional
+        Tolerated phase error in radians, checked against both
+        :func:`fraunhofer_phase_error` and :func:`paraxial_phase_error` on
+        the :func:`field_support` of ``U_s``. Defaults to pi/8.
+    fallback : bool, optional
+        If True and the tolerance is exceeded, evaluate the exact
+        :func:`surface_huygens_fresnel` integral on the same output grid
+        instead of only issuing a warning. The integral is summed over tiles
+        of observation pixels, so memory stays bounded, but its cost is
+        O(M^2) for M source samples. Defaults to False.
+
+    Returns
+    -------
+    Tuple[NDArray, NDArray, NDArray]
+        Complex field and observation coordinates, as for :func:`fresnel_propagate`.
+
+    Raises
+    ------
+    ValueError
+        If wavelength or z0 is zero, or the source grid is not evenly spaced
+        or does not match ``U_s``.
+    RuntimeWarning
+        If the estimated phase error exceeds ``max_phase_error``.
+    """
+    dx, dy = _check_source_grid(U_s, grid_x_s, grid_y_s, wavelength, z0)
+    grid_x = fft_output_grid(grid_x_s, wavelength, z0)
+    grid_y = fft_output_grid(grid_y_s, wavelength, z0)
+
+    error = max(
+        fraunhofer_phase_error(grid_x_s, grid_y_s, wavelength, z0, U_s),
+        paraxial_phase_error(grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, U_s),
+    )
+    if _handle_invalid("Fraunhofer", error, max_phase_error, fallback):
+        return _exact_transform(U_s, grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, dx, dy)
+
+    return _single_fft_transform(
+        U_s, grid_x_s, grid_y_s, grid_x, grid_y, wavelength, z0, dx, dy, source_chirp=False
+    )
+
+
+def _angular_spectrum_kz(nx, ny, dx, dy, wavelength):
+    """Axial wavenumber ``kz`` on an FFT grid and the mask of propagating waves.
+
+    ``kz`` does not depend on the propagation distance, so a transfer function
+    at any ``z`` is ``exp(1j * z * kz)`` under :func:`_angular_spectrum_mask`.
+    Evanescent components have ``kz = 0``.
+    """
+    fx = np.fft.fftfreq(nx, d=dx)[:, np.newaxis]
+    fy = np.fft.fftfreq(ny, d=dy)[np.newaxis, :]
+    arg = 1.0 - (wavelength * fx) ** 2 - (wavelength * fy) ** 2
+    propagating = arg > 0
+    kz = 2 * np.pi / wavelength * np.sqrt(np.where(propagating, arg, 0.0))
+    return kz, propagating
+
+
+def _angular_spectrum_mask(propagating, dx, dy, wavelength, z0, band_limit=True):
+    """Frequencies kept by the transfer function at distance ``z0``.
+
+    The band limit is separable, so only two 1-D masks are evaluated per
+    distance before they are combined with the cached ``propagating`` mask.
+    """
+    if not band_limit:
+        return propagating
+    nx, ny = propagating.shape
+    fx = np.fft.fftfreq(nx, d=dx)[:, np.newaxis]
+    fy = np.fft.fftfreq(ny, d=dy)[np.newaxis, :]
+    fx_limit = 1 / (wavelength * np.sqrt((2 * z0 / (nx * dx)) ** 2 + 1))
+    fy_limit = 1 / (wavelength * np.sqrt((2 * z0 / (ny * dy)) ** 2 + 1))
+    return propagating & (np.abs(fx) < fx_limit) & (np.abs(fy) < fy_limit)
+
+
+def angular_spectrum_transfer(
+    nx: int,
+    ny: int,
+    dx: float,
+    dy: float,
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    band_limit: bool = True
+) -> NDArray[np.complex128]:
+    """Angular spectrum transfer function on an ``(nx, ny)`` FFT grid.
+
+    Parameters
+    ----------
+    nx, ny : int
+        Number of samples of the (padded) field.
+    dx, dy : float
+        Sample spacing of the field.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Signed propagation distance. Defaults to 0.1.
+    band_limit : bool, optional
+        Zero the frequencies at which the transfer function is undersampled,
+        following the band-limited angular spectrum method. Defaults to True.
+
+    Returns
+    -------
+    NDArray
+        Transfer function ``H(fx, fy)`` of shape (nx, ny) in unshifted FFT
+        order. Evanescent components are set to zero.
+    """
+    kz, propagating = _angular_spectrum_kz(nx, ny, dx, dy, wavelength)
+    return np.exp(1j * z0 * kz) * _angular_spectrum_mask(propagating, dx, dy, wavelength, z0, band_limit)
+
+
+__all__ = [
+    "fft_output_grid",
+    "field_support",
+    "fresnel_number",
+    "paraxial_phase_error",
+    "fraunhofer_phase_error",
+    "fresnel_propagate",
+    "fraunhofer_propagate",
+    "angular_spectrum_transfer",
+]
@@ -3,9 +3,23 @@
 from .python_impl import (
     point_source_wavefield,
     fresnel_hologram,
+    fresnel_hologram_error,
     surface_huygens_fresnel,
     amplitude_phase,
 )
+from .fft_impl import (
+    field_support,
+    fresnel_number,
+    paraxial_phase_error,
+    fraunhofer_phase_error,
+    fresnel_propagate,
+    fraunhofer_propagate,
+)
+from .layer_impl import layer_hologram
+from .polygon_impl import polygon_hologram
+from .octree_impl import octree_hologram
+from .quadrature_impl import surface_huygens_fresnel_quadrature
+from .reconstruction_impl import reconstruct_focal_stack
 
 try:
     from .scipy_impl import fresnel_hologram_scipy
@@ -13,6 +27,12 @@ except Exception:  # pragma: no cover - SciPy optional
     def fresnel_hologram_scipy(*args, **kwargs):
         raise RuntimeError("SciPy is required for this function")
 
+try:
+    from .numba_impl import fresnel_hologram_numba
+except Exception:  # pragma: no cover - Numba optional
+    def fresnel_hologram_numba(*args, **kwargs):
+        raise RuntimeError("Numba is required for this function")
+
 try:
     from .cpp_integral import fresnel_hologram_cpp as _fresnel_hologram_cpp
 except Exception:  # pragma: no cover - fallback if build failed
@@ -28,6 +48,19 @@ __all__ = [
     "fresnel_hologram",
     "fresnel_hologram_scipy",
     "fresnel_hologram_cpp",
+    "fresnel_hologram_numba",
     "amplitude_phase",
     "surface_huygens_fresnel",
+    "field_support",
+    "fresnel_number",
+    "paraxial_phase_error",
+    "fraunhofer_phase_error",
+    "fresnel_propagate",
+    "fraunhofer_propagate",
+    "fresnel_hologram_error",
+    "layer_hologram",
+    "polygon_hologram",
+    "octree_hologram",
+    "surface_huygens_fresnel_quadrature",
+    "reconstruct_focal_stack",
 ]
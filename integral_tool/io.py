@@ -1,32 +1,58 @@
 import numpy as np
 from numpy.typing import NDArray
+from typing import Tuple, Union
 
-def load_points_from_obj(filepath: str) -> NDArray[np.float64]:
+def _parse_face(parts, n_vertices):
+    """Vertex indices of an ``f`` line, converted to 0-based."""
+    indices = []
+    for part in parts[1:]:
+        # Each entry is v, v/vt, v//vn or v/vt/vn; only v is kept.
+        idx = int(part.split('/')[0])
+        if idx == 0:
+            raise ValueError("OBJ vertex indices start at 1.")
+        # Negative indices count back from the last vertex read so far
+        indices.append(idx - 1 if idx > 0 else n_vertices + idx)
+    return indices
+
+
+def load_points_from_obj(
+    filepath: str,
+    return_faces: bool = False
+) -> Union[NDArray[np.float64], Tuple[NDArray[np.float64], NDArray[np.int32]]]:
     """
-    Load vertex coordinates from a .obj file.
+    Load vertex coordinates, and optionally faces, from a .obj file.
 
-    This function reads a .obj file and extracts the vertex coordinates,
-    ignoring all other information such as faces, normals, etc.
+    This function reads a .obj file and extracts the vertex coordinates.
+    Faces are only kept when requested; all other information such as
+    texture coordinates and normals is ignored.
 
     Parameters
     ----------
     filepath : str
         The path to the .obj file.
+    return_faces : bool, optional
+        If True, also return the faces. Polygons with more than three
+        vertices are split into a fan of triangles. Defaults to False.
 
     Returns
     -------
     NDArray[np.float64]
         An array of shape (N, 3) containing the (x, y, z) coordinates
         of the N vertices found in the file.
+    NDArray[np.int32], optional
+        Only if ``return_faces`` is True: an array of shape (F, 3) with the
+        0-based vertex indices of the F triangles.
 
     Raises
     ------
     FileNotFoundError
         If the specified file does not exist.
     ValueError
-        If the file contains no vertex lines.
+        If the file contains no vertex lines, or a face refers to a
+        vertex that does not exist.
     """
     points = []
+    faces = []
     with open(filepath, 'r') as f:
         for line in f:
             if line.startswith('v '):
@@ -38,8 +64,25 @@ def load_points_from_obj(filepath: str) -> NDArray[np.float64]:
                 except (ValueError, IndexError):
                     # Skip malformed lines
                     continue
-    
+            elif return_faces and line.startswith('f '):
+                try:
+                    indices = _parse_face(line.strip().split(), len(points))
+                except ValueError:
+                    # Skip malformed lines
+                    continue
+                if len(indices) < 3:
+                    continue
+                for i in range(1, len(indices) - 1):
+                    faces.append([indices[0], indices[i], indices[i + 1]])
+
     if not points:
         raise ValueError(f"No vertices found in the file: {filepath}")
 
-    return np.array(points, dtype=np.float64)
\ No newline at end of file
+    points = np.array(points, dtype=np.float64)
+    if not return_faces:
+        return points
+
+    faces = np.array(faces, dtype=np.int32).reshape(-1, 3)
+    if faces.size and (faces.min() < 0 or faces.max() >= len(points)):
+        raise ValueError(f"Face refers to a missing vertex in the file: {filepath}")
+    return points, faces
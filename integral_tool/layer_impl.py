@@ -0,0 +1,210 @@
+"""Layer-based hologram computation for point clouds."""
+
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional
+import warnings
+
+from .python_impl import EPSILON
+
+# Number of layers used when no depth quantization is given.
+DEFAULT_LAYERS = 256
+
+
+def depth_layers(
+    z: NDArray[np.float64],
+    layer_thickness: Optional[float] = None
+):
+    """Quantize depths into equally spaced layers.
+
+    Parameters
+    ----------
+    z : NDArray
+        1-D array of point depths.
+    layer_thickness : float, optional
+        Spacing of the layers. Defaults to the depth range divided into
+        ``DEFAULT_LAYERS`` layers.
+
+    Returns
+    -------
+    Tuple[NDArray, NDArray]
+        Tuple containing:
+        - Depth of each occupied layer, shape (L,).
+        - Index into the layer depths for every point, shape (N,).
+
+    Raises
+    ------
+    ValueError
+        If layer_thickness is not positive.
+    """
+    if layer_thickness is not None and layer_thickness <= 0:
+        raise ValueError("layer_thickness must be positive.")
+    if z.size == 0:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+    z_min, z_max = np.min(z), np.max(z)
+    if layer_thickness is None:
+        layer_thickness = (z_max - z_min) / (DEFAULT_LAYERS - 1) if z_max > z_min else 1.0
+    bins = np.rint((z - z_min) / layer_thickness).astype(np.int64)
+    occupied, layer_index = np.unique(bins, return_inverse=True)
+    return z_min + occupied * layer_thickness, layer_index.ravel()
+
+
+def layer_hologram(
+    points: NDArray[np.float64],
+    amplitude: NDArray[np.float64],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    layer_thickness: Optional[float] = None,
+    pad: int = 2,
+    oversample: int = 1
+) -> NDArray[np.complex128]:
+    """Layer-based approximation of :func:`fresnel_hologram`.
+
+    Points are binned by depth into layers and each layer is rasterized onto
+    the hologram pixel grid. Every layer is then propagated to ``z0`` by an
+    FFT convolution with the sampled point-source kernel ``exp(ikR)/R`` of its
+    depth. The spectra of all layers are summed so that only one inverse FFT
+    is needed.
+
+    Parameters
+    ----------
+    points : NDArray
+        Array of shape (N, 3) representing the coordinates (x, y, z) of N point sources.
+    amplitude : NDArray
+        Array of shape (N,) representing the amplitude of each point source.
+    grid_x : NDArray
+        Evenly spaced 1-D x-coordinates of the hologram.
+    grid_y : NDArray
+        Evenly spaced 1-D y-coordinates of the hologram.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Position of the hologram plane. Defaults to 0.1.
+    layer_thickness : float, optional
+        Depth quantization step. Smaller steps mean more layers, higher cost and
+        lower error. Defaults to the depth range split into 256 layers. This
+        only controls the depth error: points are also snapped laterally to
+        the raster, which for scenes not aligned with the pixels is usually
+        the dominant error and is not reduced by thinner layers (see
+        ``oversample``).
+    pad : int, optional
+        Size of the raster relative to the hologram. Points outside the raster
+        are dropped, so scenes wider than the hologram need a larger factor at
+        the cost of larger FFTs. Defaults to 2.
+    oversample : int, optional
+        Lateral subdivision of the raster pixels. Points are snapped to
+        ``1 / oversample`` of a pixel, which divides the lateral position
+        error by about that factor. Every layer then needs up to
+        ``oversample**2`` FFT convolutions, one per occupied sub-pixel
+        position. Defaults to 1.
+
+    Returns
+    -------
+    NDArray
+        Complex field U(x, y) on the hologram plane, shape (len(grid_x), len(grid_y)).
+
+    Raises
+    ------
+    ValueError
+        If wavelength is zero, points/amplitude arrays have incompatible shapes,
+        the hologram grid is not evenly spaced, or pad or oversample is
+        smaller than 1.
+    RuntimeWarning
+        If some points fall outside the raster and are ignored.
+
+    Notes
+    -----
+    The cost is O(L M log M) for L layers and M raster pixels, instead of
+    O(N M) for the point-by-point sum. Each point is snapped to the nearest
+    sub-pixel of its layer and its depth offset from the layer is compensated
+    by an on-axis phase factor, so the result is exact for points on sub-pixel
+    centres and layer depths. A lateral shift of up to half a sub-pixel
+    changes the phase of the kernel by up to about ``pi / (2 oversample)``
+    at the steepest angles the hologram samples, which for random scenes
+    gives relative errors of the order of 10% at ``oversample=1``. Use
+    :func:`fresnel_hologram_error` to measure the error for a given scene
+    and quantization.
+    """
+    if wavelength == 0:
+        raise ValueError("Wavelength cannot be zero.")
+    if points.shape[0] != amplitude.shape[0]:
+        raise ValueError("Points and amplitude arrays must have the same number of sources.")
+    if points.shape[1] != 3:
+        raise ValueError("Points array must have shape (N, 3).")
+    if pad < 1:
+        raise ValueError("pad must be at least 1.")
+    if oversample < 1:
+        raise ValueError("oversample must be at least 1.")
+    if len(grid_x) < 2 or len(grid_y) < 2:
+        raise ValueError("Hologram grids must contain at least two samples.")
+    dx = np.mean(np.diff(grid_x))
+    dy = np.mean(np.diff(grid_y))
+    if not np.allclose(np.diff(grid_x), dx) or not np.allclose(np.diff(grid_y), dy):
+        raise ValueError("Layer-based propagation requires evenly spaced hologram grids.")
+
+    k = 2 * np.pi / wavelength
+    nx, ny = len(grid_x), len(grid_y)
+    if points.shape[0] == 0:
+        return np.zeros((nx, ny), dtype=np.complex128)
+    # The hologram sits in the middle of a raster of pad * (nx, ny) pixels.
+    px, py = pad * nx, pad * ny
+    ox, oy = (px - nx) // 2, (py - ny) // 2
+    # Pixel offsets between raster and hologram span px + nx - 1 values, so an
+    # FFT of size px + nx makes the circular convolution a linear one.
+    fx, fy = px + nx, py + ny
+
+    # Nearest sub-pixel, split into raster pixel and sub-pixel phase
+    sx = np.rint((points[:, 0] - grid_x[0]) / dx * oversample).astype(np.int64)
+    sy = np.rint((points[:, 1] - grid_y[0]) / dy * oversample).astype(np.int64)
+    ix, qx = np.divmod(sx, oversample)
+    iy, qy = np.divmod(sy, oversample)
+    ix += ox
+    iy += oy
+    inside = (ix >= 0) & (ix < px) & (iy >= 0) & (iy < py)
+    if not np.all(inside):
+        warnings.warn(
+            f"{np.count_nonzero(~inside)} points lie outside the hologram raster and are ignored.",
+            RuntimeWarning,
+        )
+
+    z_layers, layer_index = depth_layers(points[:, 2], layer_thickness)
+    # Compensate the depth quantization with the on-axis phase of the offset
+    weights = amplitude * np.exp(-1j * k * (points[:, 2] - z_layers[layer_index]))
+
+    # Lateral kernel offsets (x - x', y - y') in FFT order
+    off_x = np.arange(fx)
+    off_x = np.where(off_x < ox + nx, off_x, off_x - fx) * dx
+    off_y = np.arange(fy)
+    off_y = np.where(off_y < oy + ny, off_y, off_y - fy) * dy
+
+    # One convolution per occupied (layer, sub-pixel phase) combination; the
+    # points are sorted once so that every group is a contiguous slice.
+    keys = (layer_index[inside] * oversample + qx[inside]) * oversample + qy[inside]
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    flat = (ix[inside] * fy + iy[inside])[order]
+    weights = weights[inside][order]
+    groups, bounds = np.unique(keys, return_index=True)
+    bounds = np.append(bounds, keys.size)
+
+    spectrum = np.zeros((fx, fy), dtype=np.complex128)
+    for key, lo, hi in zip(groups, bounds[:-1], bounds[1:]):
+        layer, phase = divmod(int(key), oversample * oversample)
+        phase_x, phase_y = divmod(phase, oversample)
+        raster = np.bincount(flat[lo:hi], weights[lo:hi].real, minlength=fx * fy) \
+            + 1j * np.bincount(flat[lo:hi], weights[lo:hi].imag, minlength=fx * fy)
+        # The sources of this group sit phase / oversample pixels past the raster pixels
+        rx = off_x - phase_x * dx / oversample
+        ry = off_y - phase_y * dy / oversample
+        R = np.sqrt(rx[:, np.newaxis] ** 2 + ry[np.newaxis, :] ** 2 + (z0 - z_layers[layer]) ** 2 + EPSILON**2)
+        spectrum += np.fft.fft2(raster.reshape(fx, fy)) * np.fft.fft2(np.exp(1j * k * R) / R)
+
+    U = np.fft.ifft2(spectrum)[ox:ox + nx, oy:oy + ny]
+
+    # Final constant multiplication: 1 / (i * lambda)
+    U *= 1 / (1j * wavelength)
+    return U
+
+__all__ = ["depth_layers", "layer_hologram"]
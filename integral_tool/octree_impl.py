@@ -0,0 +1,392 @@
+"""Hierarchical (octree) approximation of the point-source hologram."""
+
+import numpy as np
+from numpy.typing import NDArray
+from math import factorial
+
+from .python_impl import EPSILON, fresnel_hologram_error
+
+# Highest Taylor order used for the cluster/tile cross term
+MAX_ORDER = 12
+
+# Pairs with at most this many point/pixel interactions are summed exactly
+DIRECT_LIMIT = 1024
+
+# Upper bound on the number of complex values evaluated at once per tile
+BLOCK_ELEMENTS = 1 << 20
+
+
+class _Cluster:
+    """Octree node covering ``points[start:stop]`` of the reordered points."""
+
+    __slots__ = ("start", "stop", "center", "half", "radius", "children")
+
+    def __init__(self, start, stop, center, half):
+        self.start = start
+        self.stop = stop
+        self.center = center
+        self.half = half
+        self.radius = float(np.linalg.norm(half))
+        self.children = []
+
+
+def build_octree(points: NDArray[np.float64], leaf_size: int = 32, scale=None):
+    """Organise points in an octree.
+
+    Every node is the bounding box of its points and is split at its centre
+    along the axes whose scaled extent is at least half of the largest one,
+    so flat or elongated nodes get two or four children instead of eight.
+
+    Parameters
+    ----------
+    points : NDArray
+        Array of shape (N, 3) with the point coordinates.
+    leaf_size : int, optional
+        Maximum number of points in a leaf. Defaults to 32.
+    scale : NDArray, optional
+        Weights of the three axes when choosing the split axes. Defaults to
+        equal weights.
+
+    Returns
+    -------
+    Tuple[_Cluster, NDArray]
+        Tuple containing:
+        - Root node of the tree.
+        - Permutation of the points such that every node covers a
+          contiguous slice ``order[node.start:node.stop]``.
+    """
+    order = np.arange(points.shape[0])
+    scale = np.ones(3) if scale is None else np.asarray(scale, dtype=np.float64)
+
+    def build(start, stop):
+        sub = points[order[start:stop]]
+        lo, hi = sub.min(axis=0), sub.max(axis=0)
+        node = _Cluster(start, stop, (lo + hi) / 2, (hi - lo) / 2)
+        extent = node.half * scale
+        if stop - start <= leaf_size or not np.any(extent > 0):
+            return node
+        axes = np.flatnonzero(extent >= extent.max() / 2)
+        octant = np.zeros(stop - start, dtype=np.int64)
+        for bit, axis in enumerate(axes):
+            octant += (sub[:, axis] > node.center[axis]) << bit
+        order[start:stop] = order[start:stop][np.argsort(octant, kind="stable")]
+        bounds = start + np.concatenate([[0], np.cumsum(np.bincount(octant, minlength=1 << len(axes)))])
+        for lo_, hi_ in zip(bounds[:-1], bounds[1:]):
+            if hi_ > lo_:
+                node.children.append(build(lo_, hi_))
+        return node
+
+    return build(0, points.shape[0]), order
+
+
+def _flatten(root):
+    """Node arrays of the tree, with children as lists of node indices."""
+    nodes = [root]
+    children = []
+    for node in nodes:
+        children.append(list(range(len(nodes), len(nodes) + len(node.children))))
+        nodes.extend(node.children)
+    center = np.array([node.center for node in nodes])
+    half = np.array([node.half for node in nodes])
+    start = np.array([node.start for node in nodes])
+    stop = np.array([node.stop for node in nodes])
+    return center, half, start, stop, children
+
+
+def _taylor_order(x, tolerance):
+    """Smallest orders p with x^(p+1)/(p+1)! <= tolerance, or -1."""
+    x = np.asarray(x, dtype=np.float64)
+    order = np.full(x.shape, -1)
+    term = x.copy()
+    for p in range(MAX_ORDER + 1):
+        order[(order < 0) & (term <= tolerance)] = p
+        term = term * x / (p + 2)
+    return order
+
+
+def _exponents(order, depth_order):
+    """Exponents (i, j, l) of the expansion, i + j <= order and l <= depth_order."""
+    return np.array([
+        (i, m - i, l)
+        for l in range(depth_order + 1)
+        for m in range(order + 1)
+        for i in range(m + 1)
+    ])
+
+
+def _monomials(u, v, w, exponents):
+    """Columns u^i v^j w^l for the rows of ``exponents``, shape (n, rank)."""
+    return u[:, np.newaxis] ** exponents[:, 0] * v[:, np.newaxis] ** exponents[:, 1] * w[:, np.newaxis] ** exponents[:, 2]
+
+
+def _taylor_coefficients(scale, depth_scale, exponents):
+    """Coefficients scale^(i+j) / (i! j!) * depth_scale^l / l! of the rows of ``exponents``."""
+    return np.array([
+        scale ** (i + j) / (factorial(i) * factorial(j)) * depth_scale ** l / factorial(l)
+        for i, j, l in exponents
+    ])
+
+
+def _segment_chunks(start, stop, size):
+    """Indices of the ranges ``start[n]:stop[n]`` in chunks of at most ``size`` points.
+
+    Yields the point indices of every chunk together with the range ``n``
+    each of them belongs to, in order, so that memory does not grow with the
+    total number of points.
+    """
+    offsets = np.concatenate([[0], np.cumsum(stop - start)])
+    for lo in range(0, offsets[-1], size):
+        hi = min(lo + size, offsets[-1])
+        ranges = np.arange(np.searchsorted(offsets, lo, side="right") - 1, np.searchsorted(offsets, hi))
+        counts = np.minimum(offsets[ranges + 1], hi) - np.maximum(offsets[ranges], lo)
+        which = np.repeat(ranges, counts)
+        yield start[which] + np.arange(lo, hi) - offsets[which], which
+
+
+def _direct_tile(pts, amp, start, stop, x, y, k, z0):
+    """Exact field on the pixels ``(x, y)`` of the points of the ranges ``start:stop``."""
+    field = np.zeros(x.shape[0], dtype=np.complex128)
+    for idx, _ in _segment_chunks(start, stop, max(1, BLOCK_ELEMENTS // x.shape[0])):
+        src = pts[idx]
+        R = np.sqrt(
+            (x[:, np.newaxis] - src[:, 0]) ** 2
+            + (y[:, np.newaxis] - src[:, 1]) ** 2
+            + (z0 - src[:, 2]) ** 2
+            + EPSILON ** 2
+        )
+        field += np.exp(1j * k * R) / R @ amp[idx]
+    return field
+
+
+def _expand_tile(pts, amp, center, start, stop, x, y, t, b, k, z0, order, depth_order, beta_scale, gamma_scale):
+    """Field on the pixels ``(x, y)`` of a tile from clusters expanded about its centre ``t``."""
+    exponents = _exponents(order, depth_order)
+    D = np.linalg.norm(t - center, axis=-1)
+
+    # Source side: exact distance A to the tile centre and the mixed phase
+    # features, accumulated over chunks of points
+    moments = np.zeros((center.shape[0], exponents.shape[0]), dtype=np.complex128)
+    for idx, which in _segment_chunks(start, stop, max(1, BLOCK_ELEMENTS // exponents.shape[0])):
+        src = pts[idx]
+        s = src[:, :2] - t[:2]
+        s_c = center[which, :2] - t[:2]
+        A = np.sqrt(s[:, 0] ** 2 + s[:, 1] ** 2 + (z0 - src[:, 2]) ** 2)
+        beta = s / A[:, np.newaxis] - s_c / D[which, np.newaxis]
+        gamma = (1 / A - 1 / D[which]) / 2
+        w = amp[idx] * np.exp(1j * k * A) / A
+        src_basis = _monomials(beta[:, 0] / beta_scale, beta[:, 1] / beta_scale, gamma / gamma_scale, exponents)
+        first = np.flatnonzero(np.diff(which, prepend=-1))
+        moments[which[first]] += np.add.reduceat(w[:, np.newaxis] * src_basis, first, axis=0)
+
+    # Pixel side: exact distance B from every cluster centre and the Taylor basis
+    q_x, q_y = x - t[0], y - t[1]
+    obs_basis = _monomials(q_x / b, q_y / b, (q_x ** 2 + q_y ** 2) / b ** 2, exponents)
+    coeff = _taylor_coefficients(-1j * k * b * beta_scale, 1j * k * b ** 2 * gamma_scale, exponents)
+    series = obs_basis @ (coeff[:, np.newaxis] * moments.T)
+    B = np.sqrt(
+        (x[:, np.newaxis] - center[:, 0]) ** 2
+        + (y[:, np.newaxis] - center[:, 1]) ** 2
+        + (z0 - center[:, 2]) ** 2
+    )
+    return np.sum(np.exp(1j * k * (B - D)) * (D / B) * series, axis=-1)
+
+
+def _split_tile(tile):
+    i0, i1, j0, j1 = tile
+    im = (i0 + i1) // 2 if i1 - i0 > 1 else i1
+    jm = (j0 + j1) // 2 if j1 - j0 > 1 else j1
+    return [
+        (a0, a1, b0, b1)
+        for a0, a1 in ((i0, im), (im, i1))
+        for b0, b1 in ((j0, jm), (jm, j1))
+        if a1 > a0 and b1 > b0
+    ]
+
+
+def octree_hologram(
+    points: NDArray[np.float64],
+    amplitude: NDArray[np.float64],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    tolerance: float = 1e-3,
+    leaf_size: int = 32,
+    return_error: bool = False
+):
+    """Approximate :func:`fresnel_hologram` with a hierarchical cluster expansion.
+
+    Source points are organised in an octree and the observation grid in a
+    quadtree of pixel tiles. A cluster around ``c`` and a tile around ``t``
+    interact through a separable factorisation of ``exp(ikR)/R``: the
+    distance ``A`` of every point to ``t`` and the distance ``B`` of every
+    pixel to ``c`` are evaluated exactly, and only the mixed remainder
+    ``R - A - B + |t - c|`` is expanded. In the Fresnel approximation it is
+    ``-q . beta + |q|^2 gamma``, with ``q`` the pixel offset in the tile and
+    ``beta``, ``gamma`` depending on the point only, and its exponential is
+    expanded in a Taylor series of adaptive order. Such a pair then costs
+    O((n_points + n_pixels) * rank) instead of O(n_points * n_pixels). Pairs
+    whose estimated error exceeds ``tolerance`` are split, and the remaining
+    near pairs of a tile are summed exactly in one vectorized call.
+
+    Parameters
+    ----------
+    points : NDArray
+        Array of shape (N, 3) representing the coordinates (x, y, z) of N point sources.
+    amplitude : NDArray
+        Array of shape (N,) representing the amplitude of each point source.
+    grid_x : NDArray
+        1-D array of x-coordinates for the observation grid.
+    grid_y : NDArray
+        1-D array of y-coordinates for the observation grid.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Position of the observation plane. Defaults to 0.1.
+    tolerance : float, optional
+        Target relative error of every cluster/tile contribution. Defaults to 1e-3.
+    leaf_size : int, optional
+        Maximum number of points in an octree leaf. Defaults to 32.
+    return_error : bool, optional
+        If True, also return the relative error against the exact kernel,
+        measured with :func:`fresnel_hologram_error` on a subgrid of about
+        16 x 16 pixels. Defaults to False.
+
+    Returns
+    -------
+    NDArray
+        Complex field U(x, y) on the observation plane, shape (len(grid_x), len(grid_y)).
+    float, optional
+        Only if ``return_error`` is True: the achieved relative error.
+
+    Raises
+    ------
+    ValueError
+        If wavelength is zero, points/amplitude arrays have incompatible
+        shapes or tolerance is not positive.
+
+    Notes
+    -----
+    For a tile of radius ``b`` and a cluster of lateral radius ``a`` and
+    depth ``h`` at distance ``D``, the Taylor series are truncated where
+    ``x^(p+1)/(p+1)!`` drops below ``tolerance / 4``, with ``x`` about
+    ``k a b / D`` for the lateral term and ``k b^2 h / (2 D^2)`` for the
+    defocus term. The neglected higher Fresnel terms of the mixed remainder
+    and the error of the separable amplitude ``|t - c| / (A B)`` are bounded
+    by ``tolerance / 2``. Since the depth only enters through the defocus
+    term, the octree splits depth at a correspondingly reduced weight, so
+    deep scenes are clustered in columns. The tolerance bounds each
+    contribution relative to its own magnitude, so strong destructive
+    interference in the total field can make the achieved error larger than
+    ``tolerance``.
+    """
+    if wavelength == 0:
+        raise ValueError("Wavelength cannot be zero.")
+    if points.shape[0] != amplitude.shape[0]:
+        raise ValueError("Points and amplitude arrays must have the same number of sources.")
+    if points.shape[1] != 3:
+        raise ValueError("Points array must have shape (N, 3).")
+    if tolerance <= 0:
+        raise ValueError("tolerance must be positive.")
+
+    k = 2 * np.pi / wavelength
+    nx, ny = len(grid_x), len(grid_y)
+    U = np.zeros((nx, ny), dtype=np.complex128)
+    if points.shape[0] == 0:
+        return (U, 0.0) if return_error else U
+
+    # Depth counts b / (2 D) as much as the lateral extent, for b the half
+    # diagonal of the hologram and D its distance to the cloud.
+    distance = abs(z0 - float(np.mean(points[:, 2])))
+    b_max = np.hypot(grid_x[-1] - grid_x[0], grid_y[-1] - grid_y[0]) / 2
+    depth_weight = min(1.0, b_max / (2 * distance)) if distance > 0 else 1.0
+    root, order = build_octree(points, leaf_size, scale=(1.0, 1.0, depth_weight))
+    pts = points[order]
+    amp = np.asarray(amplitude, dtype=np.complex128)[order]
+    center, half, start, stop, children = _flatten(root)
+    count = stop - start
+    has_children = np.array([bool(c) for c in children])
+    radius = np.linalg.norm(half, axis=-1)
+    a_perp = np.hypot(half[:, 0], half[:, 1])
+    a_depth = half[:, 2]
+
+    stack = [((0, nx, 0, ny), np.array([0]))]
+    while stack:
+        tile, ids = stack.pop()
+        i0, i1, j0, j1 = tile
+        n_pix = (i1 - i0) * (j1 - j0)
+        t = np.array([(grid_x[i0] + grid_x[i1 - 1]) / 2, (grid_y[j0] + grid_y[j1 - 1]) / 2, z0])
+        b = abs(np.hypot(grid_x[i1 - 1] - grid_x[i0], grid_y[j1 - 1] - grid_y[j0])) / 2
+        tile_splittable = n_pix > 1
+
+        expanded, direct, deferred = [], [], []
+        while ids.size:
+            d = t - center[ids]
+            D = np.linalg.norm(d, axis=-1)
+            a = radius[ids]
+            s_c = np.hypot(d[:, 0], d[:, 1])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                near = D - a
+                # Bounds of |A - D|, |beta| and |gamma| over the points of each cluster
+                dA = a_depth[ids] + a_perp[ids] * (2 * s_c + a_perp[ids]) / (2 * near)
+                beta = (a_perp[ids] + s_c * dA / D) / near
+                gamma = dA / (2 * D * near)
+                # Fourth-order Fresnel terms of the mixed remainder and amplitude error
+                q_sq = b ** 2 + 2 * b * (s_c + a_perp[ids])
+                residual = k * q_sq * (b * a_perp[ids] / (2 * near ** 3) + 3 * q_sq * dA / (8 * near ** 4))
+                residual += b * (beta + 2 * b * gamma) / near
+            p1 = _taylor_order(k * b * beta, tolerance / 4)
+            p2 = _taylor_order(k * b ** 2 * gamma, tolerance / 4)
+            rank = (p1 + 1) * (p1 + 2) // 2 * (p2 + 1)
+            accept = (
+                (D > 2 * (a + b)) & (p1 >= 0) & (p2 >= 0) & (residual <= tolerance / 2)
+                & (count[ids] * n_pix > rank * (count[ids] + n_pix))
+            )
+            expanded.append((ids[accept], p1[accept], p2[accept], beta[accept], gamma[accept]))
+
+            rest, a = ids[~accept], a[~accept]
+            small = count[rest] * n_pix <= DIRECT_LIMIT
+            opened = ~small & has_children[rest] & ((a >= b) | (not tile_splittable))
+            defer = ~small & ~opened & tile_splittable
+            direct.append(rest[~opened & ~defer])
+            deferred.append(rest[defer])
+            ids = np.array([child for node in rest[opened] for child in children[node]], dtype=np.int64)
+
+        x, y = np.meshgrid(grid_x[i0:i1], grid_y[j0:j1], indexing="ij")
+        x, y = x.ravel(), y.ravel()
+        field = np.zeros(n_pix, dtype=np.complex128)
+
+        ids, p1, p2, beta, gamma = (np.concatenate(part) for part in zip(*expanded))
+        # Clusters with the same orders share the Taylor basis of the tile
+        for key in np.unique(p1 * (MAX_ORDER + 1) + p2):
+            group = ids[p1 * (MAX_ORDER + 1) + p2 == key]
+            beta_scale = beta[p1 * (MAX_ORDER + 1) + p2 == key].max() or 1.0
+            gamma_scale = gamma[p1 * (MAX_ORDER + 1) + p2 == key].max() or 1.0
+            chunk = max(1, BLOCK_ELEMENTS // n_pix)
+            for lo in range(0, group.size, chunk):
+                sel = group[lo:lo + chunk]
+                field += _expand_tile(
+                    pts, amp, center[sel], start[sel], stop[sel], x, y, t, b, k, z0,
+                    int(key) // (MAX_ORDER + 1), int(key) % (MAX_ORDER + 1), beta_scale, gamma_scale,
+                )
+
+        ids = np.concatenate(direct)
+        if ids.size:
+            field += _direct_tile(pts, amp, start[ids], stop[ids], x, y, k, z0)
+        U[i0:i1, j0:j1] += field.reshape(i1 - i0, j1 - j0)
+
+        ids = np.concatenate(deferred)
+        if ids.size:
+            stack.extend((sub, ids) for sub in _split_tile(tile))
+
+    # Final constant multiplication: 1 / (i * lambda)
+    U *= 1 / (1j * wavelength)
+
+    if return_error:
+        stride = max(1, max(len(grid_x), len(grid_y)) // 16)
+        error = fresnel_hologram_error(U, points, amplitude, grid_x, grid_y, wavelength, z0, stride)
+        return U, error
+    return U
+
+
+__all__ = ["build_octree", "octree_hologram"]
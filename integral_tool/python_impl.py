@@ -6,6 +6,9 @@ import warnings
 # Add a small epsilon for numerical stability to avoid division by zero
 EPSILON = 1e-10
 
+# Maximum number of point/pixel pairs evaluated at once by fresnel_hologram_error
+ERROR_CHUNK_ELEMENTS = 1 << 20
+
 
 def point_source_wavefield(
     points: NDArray[np.float64],
@@ -131,6 +134,57 @@ def fresnel_hologram(
     return U
 
 
+def fresnel_hologram_error(
+    U: NDArray[np.complex128],
+    points: NDArray[np.float64],
+    amplitude: NDArray[np.float64],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    stride: int = 1
+) -> float:
+    """Relative L2 error of an approximate hologram against :func:`fresnel_hologram`.
+
+    Parameters
+    ----------
+    U : NDArray
+        Approximate field of shape (len(grid_x), len(grid_y)).
+    points, amplitude, grid_x, grid_y, wavelength, z0
+        Arguments that produced ``U``, as for :func:`fresnel_hologram`.
+    stride : int, optional
+        Only every ``stride``-th row and column is compared, which keeps the
+        exact reference affordable for large grids. Defaults to 1.
+
+    Returns
+    -------
+    float
+        ``||U - U_exact|| / ||U_exact||`` over the sampled pixels.
+
+    Raises
+    ------
+    ValueError
+        If U does not match the observation grid or stride is not positive.
+    """
+    if U.shape != (len(grid_x), len(grid_y)):
+        raise ValueError("U shape must match the dimensions of grid_x and grid_y.")
+    if stride < 1:
+        raise ValueError("stride must be a positive integer.")
+    gx, gy = grid_x[::stride], grid_y[::stride]
+    # Accumulate the reference over chunks of points to bound the memory of
+    # the (Nx, Ny, N_chunk, 3) temporaries in fresnel_hologram.
+    chunk = max(1, ERROR_CHUNK_ELEMENTS // (len(gx) * len(gy)))
+    U_exact = np.zeros((len(gx), len(gy)), dtype=np.complex128)
+    for start in range(0, points.shape[0], chunk):
+        U_exact += fresnel_hologram(
+            points[start:start + chunk], amplitude[start:start + chunk], gx, gy, wavelength, z0
+        )
+    norm = np.linalg.norm(U_exact)
+    if norm == 0:
+        return float(np.linalg.norm(U[::stride, ::stride]))
+    return float(np.linalg.norm(U[::stride, ::stride] - U_exact) / norm)
+
+
 def amplitude_phase(U: NDArray[np.complex128]) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
     """Return amplitude and phase of a complex field.
 
@@ -0,0 +1,217 @@
+"""Separable quadrature for the Huygens-Fresnel surface integral."""
+
+import numpy as np
+from numpy.typing import NDArray
+from typing import Callable, Tuple
+
+from .python_impl import EPSILON
+
+# Upper bound on the number of (pixel, source node) pairs evaluated at once
+TILE_ELEMENTS = 1 << 21
+
+
+def quadrature_rule(
+    n: int,
+    lower: float,
+    upper: float,
+    rule: str = "gauss"
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Nodes and weights of a 1-D quadrature rule on ``[lower, upper]``.
+
+    Parameters
+    ----------
+    n : int
+        Number of nodes. Composite Simpson needs an odd number of at least three.
+    lower, upper : float
+        Integration bounds.
+    rule : {"gauss", "simpson"}, optional
+        Gauss--Legendre or composite Simpson rule. Defaults to "gauss".
+
+    Returns
+    -------
+    Tuple[NDArray, NDArray]
+        Tuple containing:
+        - Nodes, shape (n,).
+        - Weights, shape (n,).
+
+    Raises
+    ------
+    ValueError
+        If the rule is unknown or n is not valid for it.
+    """
+    if rule == "gauss":
+        if n < 1:
+            raise ValueError("Gauss-Legendre quadrature needs at least one node.")
+        t, w = np.polynomial.legendre.leggauss(n)
+        half = (upper - lower) / 2
+        return lower + half * (t + 1), half * w
+    if rule == "simpson":
+        if n < 3 or n % 2 == 0:
+            raise ValueError("Composite Simpson quadrature needs an odd number of at least three nodes.")
+        nodes = np.linspace(lower, upper, n)
+        h = (upper - lower) / (n - 1)
+        w = np.full(n, 2.0)
+        w[1::2] = 4.0
+        w[0] = w[-1] = 1.0
+        return nodes, w * h / 3
+    raise ValueError(f"Unknown quadrature rule: {rule}")
+
+
+def _lower_order(n, rule):
+    """Node count of the coarser rule used for the error estimate."""
+    if rule == "simpson":
+        return max(3, (n // 2) | 1)
+    return max(1, n // 2)
+
+
+def weighted_surface_sum(
+    U_w: NDArray[np.complex128],
+    xs: NDArray[np.float64],
+    ys: NDArray[np.float64],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1
+) -> NDArray[np.complex128]:
+    """Exact Huygens--Fresnel sum over pre-weighted source samples, tile by tile.
+
+    Parameters
+    ----------
+    U_w : NDArray (Nx_s, Ny_s)
+        Source field at ``(xs, ys)`` already multiplied by the quadrature weights.
+    xs, ys : NDArray
+        1-D source coordinates.
+    grid_x, grid_y : NDArray
+        1-D observation coordinates at ``z=z0``.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Distance between the source and observation planes. Defaults to 0.1.
+
+    Returns
+    -------
+    NDArray
+        Complex field ``U(x, y)``, shape (len(grid_x), len(grid_y)). Only one
+        block of ``TILE_ELEMENTS`` (pixel, source) pairs is held in memory.
+    """
+    k = 2 * np.pi / wavelength
+    nx, ny = U_w.shape
+    x_obs, y_obs = np.meshgrid(grid_x, grid_y, indexing="ij")
+    x_obs, y_obs = x_obs.ravel(), y_obs.ravel()
+    U = np.empty(x_obs.size, dtype=np.complex128)
+    tile = max(1, TILE_ELEMENTS // (nx * ny))
+    for start in range(0, x_obs.size, tile):
+        sl = slice(start, start + tile)
+        # (tile, nx, 1) and (tile, 1, ny): only one (tile, nx, ny) block at a time
+        dx_ = x_obs[sl, np.newaxis, np.newaxis] - xs[np.newaxis, :, np.newaxis]
+        dy_ = y_obs[sl, np.newaxis, np.newaxis] - ys[np.newaxis, np.newaxis, :]
+        R = np.sqrt(dx_ ** 2 + dy_ ** 2 + z0 ** 2 + EPSILON ** 2)
+        K = (1.0 + z0 / R) / 2.0
+        U[sl] = np.sum(U_w * K * np.exp(1j * k * R) / R, axis=(-2, -1))
+
+    # Final constant multiplication: 1 / (i * lambda)
+    U *= 1 / (1j * wavelength)
+    return U.reshape(len(grid_x), len(grid_y))
+
+
+def _integrate(source, x_bounds, y_bounds, nx, ny, rule, grid_x, grid_y, wavelength, z0):
+    xs, wx = quadrature_rule(nx, *x_bounds, rule=rule)
+    ys, wy = quadrature_rule(ny, *y_bounds, rule=rule)
+    xg, yg = np.meshgrid(xs, ys, indexing="ij")
+    # Fold the separable weights into the sampled source once
+    U_w = np.asarray(source(xg, yg), dtype=np.complex128) * (wx[:, np.newaxis] * wy[np.newaxis, :])
+    if U_w.shape != (nx, ny):
+        raise ValueError("source must return an array shaped like its arguments.")
+
+    return weighted_surface_sum(U_w, xs, ys, grid_x, grid_y, wavelength, z0)
+
+
+def surface_huygens_fresnel_quadrature(
+    source: Callable[[NDArray[np.float64], NDArray[np.float64]], NDArray[np.complex128]],
+    x_bounds: Tuple[float, float],
+    y_bounds: Tuple[float, float],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    wavelength: float = 532e-9,
+    z0: float = 0.1,
+    n: Tuple[int, int] = (32, 32),
+    rule: str = "gauss",
+    return_error: bool = False
+):
+    """Evaluate the Huygens--Fresnel surface integral with a separable quadrature rule.
+
+    Computes the same integral as :func:`surface_huygens_fresnel`, but the
+    source is sampled at the nodes of a tensor-product Gauss--Legendre or
+    composite Simpson rule instead of a uniform grid with a rectangle rule.
+    For smooth sources this reaches a given accuracy with far fewer source
+    samples. Observation pixels are processed in tiles so that memory stays
+    bounded by ``TILE_ELEMENTS`` regardless of the grid sizes.
+
+    Parameters
+    ----------
+    source : callable
+        Function ``source(x', y')`` returning the complex source field for
+        arrays of source coordinates, with the shape of its arguments.
+    x_bounds : Tuple[float, float]
+        Integration bounds along ``x'``.
+    y_bounds : Tuple[float, float]
+        Integration bounds along ``y'``.
+    grid_x : NDArray
+        1-D array of the observation x-coordinates at ``z=z0``.
+    grid_y : NDArray
+        1-D array of the observation y-coordinates at ``z=z0``.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    z0 : float, optional
+        Distance between the source and observation planes. Defaults to 0.1.
+    n : Tuple[int, int], optional
+        Number of quadrature nodes along ``x'`` and ``y'``. Defaults to (32, 32).
+    rule : {"gauss", "simpson"}, optional
+        Quadrature rule along each axis. Defaults to "gauss".
+    return_error : bool, optional
+        If True, also return an error estimate: the relative difference to
+        the same rule with about half the nodes per axis. It bounds the error
+        of the coarser rule and is therefore conservative for the returned
+        field. Defaults to False.
+
+    Returns
+    -------
+    NDArray
+        Complex field ``U(x, y)`` on the observation plane, shape (len(grid_x), len(grid_y)).
+    float, optional
+        Only if ``return_error`` is True: the estimated relative error.
+
+    Raises
+    ------
+    ValueError
+        If wavelength or z0 is zero, the observation grids are not 1-D, the
+        node counts are invalid for the chosen rule, or ``return_error`` is
+        requested with the smallest node count of the rule, which has no
+        coarser rule to compare with.
+    """
+    if wavelength == 0:
+        raise ValueError("Wavelength cannot be zero.")
+    if z0 == 0:
+        raise ValueError("Propagation distance z0 cannot be zero.")
+    if grid_x.ndim != 1 or grid_y.ndim != 1:
+        raise ValueError("Observation grids grid_x and grid_y must be 1-dimensional.")
+
+    nx, ny = n
+    if return_error and (_lower_order(nx, rule) == nx or _lower_order(ny, rule) == ny):
+        raise ValueError(
+            "return_error needs a coarser rule to compare with: at least 2 Gauss or 5 Simpson nodes per axis."
+        )
+    U = _integrate(source, x_bounds, y_bounds, nx, ny, rule, grid_x, grid_y, wavelength, z0)
+    if not return_error:
+        return U
+
+    U_low = _integrate(
+        source, x_bounds, y_bounds, _lower_order(nx, rule), _lower_order(ny, rule),
+        rule, grid_x, grid_y, wavelength, z0,
+    )
+    norm = np.linalg.norm(U)
+    error = np.linalg.norm(U - U_low) / norm if norm > 0 else np.linalg.norm(U_low)
+    return U, float(error)
+
+
+__all__ = ["quadrature_rule", "weighted_surface_sum", "surface_huygens_fresnel_quadrature"]
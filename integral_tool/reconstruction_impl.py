@@ -0,0 +1,222 @@
+"""Numerical reconstruction of holograms over many depths."""
+
+from collections import OrderedDict, namedtuple
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional, Sequence
+
+from .fft_impl import _angular_spectrum_kz, _angular_spectrum_mask
+
+try:
+    from scipy import fft as _fft
+    _FFT_KWARGS = {"workers": -1}
+except Exception:  # pragma: no cover - SciPy optional
+    _fft = np.fft
+    _FFT_KWARGS = {}
+
+# Upper bound on the memory held by cached transfer functions. A 2048 x 2048
+# transfer function takes 64 MB, a padded 4096 x 4096 one 256 MB.
+TRANSFER_CACHE_BYTES = 1 << 31
+# Number of (grid, wavelength) combinations whose axial wavenumbers are kept.
+KZ_CACHE_SIZE = 4
+# Largest phase error, in radians, accepted when a transfer function is
+# stepped from the previous plane instead of evaluated afresh.
+STEP_PHASE_TOLERANCE = 1e-6
+# Number of consecutive steps after which the phase is evaluated afresh, so
+# rounding errors of the repeated products stay negligible.
+STEP_LIMIT = 1024
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _TransferCache:
+    """LRU cache of :func:`angular_spectrum_transfer` bounded in bytes.
+
+    Calling the cache with ``(nx, ny, dx, dy, wavelength, z, band_limit=True)``
+    returns the transfer function, computing it on a miss. The returned array
+    is shared between callers and therefore read-only. Least recently used
+    entries are evicted once the cached arrays exceed ``maxsize`` bytes,
+    except for the keys passed in ``keep``. If nothing else can be evicted
+    the new entry is returned without being cached, so a sweep longer than
+    the cache keeps hitting on the part that fits instead of evicting itself.
+
+    A miss does not recompute the transfer function from scratch: the axial
+    wavenumber ``kz`` is cached per grid and wavelength, and the phase
+    ``exp(1j * z * kz)`` of the previous miss is multiplied by the factor
+    ``exp(1j * step * kz)``. Evenly spaced sweeps therefore cost one complex
+    multiplication per plane instead of a complex exponential.
+    ``cache_info()`` reports hits, misses and the bound and current size in
+    bytes; ``cache_clear()`` releases the memory.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._currsize = 0
+        self._hits = 0
+        self._misses = 0
+        self._kz = OrderedDict()
+        self._last = None
+
+    @staticmethod
+    def key(nx, ny, dx, dy, wavelength, z, band_limit=True):
+        return (int(nx), int(ny), float(dx), float(dy), float(wavelength), float(z), bool(band_limit))
+
+    def __call__(self, nx, ny, dx, dy, wavelength, z, band_limit=True, keep=()):
+        key = self.key(nx, ny, dx, dy, wavelength, z, band_limit)
+        H = self._entries.get(key)
+        if H is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return H
+        self._misses += 1
+        grid = (int(nx), int(ny), float(dx), float(dy), float(wavelength))
+        phase, propagating = self._phase(grid, float(z))
+        H = phase * _angular_spectrum_mask(propagating, dx, dy, wavelength, z, band_limit)
+        H.flags.writeable = False
+
+        evictable = [old for old in self._entries if old not in keep]
+        while self._currsize + H.nbytes > self.maxsize and evictable:
+            self._currsize -= self._entries.pop(evictable.pop(0)).nbytes
+        if self._currsize + H.nbytes <= self.maxsize:
+            self._entries[key] = H
+            self._currsize += H.nbytes
+        return H
+
+    def _phase(self, grid, z):
+        entry = self._kz.get(grid)
+        if entry is None:
+            kz, propagating = _angular_spectrum_kz(*grid)
+            entry = self._kz[grid] = (kz, propagating, float(kz.max()))
+            if len(self._kz) > KZ_CACHE_SIZE:
+                self._kz.popitem(last=False)
+        else:
+            self._kz.move_to_end(grid)
+        kz, propagating, kz_max = entry
+
+        last = self._last
+        if last is None or last[0] != grid or last[5] >= STEP_LIMIT:
+            phase = np.exp(1j * z * kz)
+            self._last = (grid, z, phase, None, None, 0)
+            return phase, propagating
+        _, z_last, phase_last, step, factor, count = last
+        if factor is None or abs(z - z_last - step) * kz_max > STEP_PHASE_TOLERANCE:
+            step = z - z_last
+            factor = np.exp(1j * step * kz)
+        phase = phase_last * factor
+        # The phase belongs to z_last + step, which is within the tolerance of z
+        self._last = (grid, z_last + step, phase, step, factor, count + 1)
+        return phase, propagating
+
+    def cache_info(self):
+        return CacheInfo(self._hits, self._misses, self.maxsize, self._currsize)
+
+    def cache_clear(self):
+        self._entries.clear()
+        self._currsize = 0
+        self._hits = 0
+        self._misses = 0
+        self._kz.clear()
+        self._last = None
+
+
+cached_transfer = _TransferCache(TRANSFER_CACHE_BYTES)
+
+
+def reconstruct_focal_stack(
+    hologram: NDArray[np.complex128],
+    grid_x: NDArray[np.float64],
+    grid_y: NDArray[np.float64],
+    z_values: Sequence[float],
+    wavelength: float = 532e-9,
+    pad: bool = False,
+    output: Optional[str] = None,
+    dtype=None,
+) -> NDArray[np.float64]:
+    """Reconstructed intensities of a hologram at several distances.
+
+    The hologram is transformed once; every slice then costs one
+    multiplication with a cached angular spectrum transfer function and one
+    inverse FFT, instead of a full :func:`surface_huygens_fresnel` evaluation.
+    The cache holds up to ``TRANSFER_CACHE_BYTES``; repeated sweeps that do
+    not fit still reuse the part of the sweep that does, and planes missing
+    from the cache are stepped from their neighbours. Transfer functions are
+    always evaluated in double precision; ``dtype`` sets the precision of the
+    inverse FFTs and of the stored intensities.
+
+    Parameters
+    ----------
+    hologram : NDArray (Nx, Ny)
+        Complex field on the hologram plane, e.g. from ``fresnel_hologram*``.
+    grid_x : NDArray
+        Evenly spaced 1-D x-coordinates of the hologram.
+    grid_y : NDArray
+        Evenly spaced 1-D y-coordinates of the hologram.
+    z_values : Sequence[float]
+        Signed propagation distances from the hologram plane. A hologram
+        computed at ``z0`` refocuses an object at depth ``z`` for ``z - z0``.
+    wavelength : float, optional
+        Wavelength of the wave. Defaults to 532e-9.
+    pad : bool, optional
+        Zero-pad to twice the size to avoid circular wrap-around, at four
+        times the cost per slice. Defaults to False.
+    output : str, optional
+        Path of a ``.npy`` file. If given, slices are streamed to a
+        memory-mapped array in that file instead of being held in memory.
+    dtype : {np.float32, np.float64}, optional
+        Precision of the intensities. Defaults to ``float64``; ``float32``
+        halves the memory of the stack and the cost of the inverse FFTs.
+
+    Returns
+    -------
+    NDArray
+        Intensities ``|U|^2`` of shape (len(z_values), Nx, Ny). A memory-mapped
+        array if ``output`` is given, of dtype ``dtype``.
+
+    Raises
+    ------
+    ValueError
+        If wavelength is zero, the hologram does not match the grids, the
+        grids are not evenly spaced or ``dtype`` is not a supported floating
+        point type.
+    """
+    if wavelength == 0:
+        raise ValueError("Wavelength cannot be zero.")
+    dtype = np.dtype(np.float64 if dtype is None else dtype)
+    if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError("dtype must be float32 or float64.")
+    if grid_x.ndim != 1 or grid_y.ndim != 1:
+        raise ValueError("Hologram grids grid_x and grid_y must be 1-dimensional.")
+    if hologram.shape != (len(grid_x), len(grid_y)):
+        raise ValueError("Hologram shape must match the dimensions of grid_x and grid_y.")
+    if len(grid_x) < 2 or len(grid_y) < 2:
+        raise ValueError("Hologram grids must contain at least two samples.")
+    dx = float(np.mean(np.diff(grid_x)))
+    dy = float(np.mean(np.diff(grid_y)))
+    if not np.allclose(np.diff(grid_x), dx) or not np.allclose(np.diff(grid_y), dy):
+        raise ValueError("Reconstruction requires evenly spaced hologram grids.")
+
+    nx, ny = hologram.shape
+    px, py = (2 * nx, 2 * ny) if pad else (nx, ny)
+    spectrum = _fft.fft2(hologram, s=(px, py), **_FFT_KWARGS)
+
+    shape = (len(z_values), nx, ny)
+    if output is None:
+        stack = np.empty(shape, dtype=dtype)
+    else:
+        stack = np.lib.format.open_memmap(output, mode="w+", dtype=dtype, shape=shape)
+    complex_dtype = np.result_type(dtype, np.complex64)
+
+    # Transfer functions of this sweep are never evicted by the sweep itself
+    sweep = {cached_transfer.key(px, py, dx, dy, wavelength, z) for z in z_values}
+    for i, z in enumerate(z_values):
+        H = cached_transfer(px, py, dx, dy, wavelength, z, keep=sweep)
+        U = _fft.ifft2((spectrum * H).astype(complex_dtype, copy=False), **_FFT_KWARGS)[:nx, :ny]
+        stack[i] = U.real ** 2 + U.imag ** 2
+
+    if output is not None:
+        stack.flush()
+    return stack
+
+
+__all__ = ["cached_transfer", "reconstruct_focal_stack"]
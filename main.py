@@ -6,6 +6,7 @@ from integral_tool.integral import (
     fresnel_hologram,
     fresnel_hologram_scipy,
     fresnel_hologram_cpp,
+    fresnel_hologram_numba,
     amplitude_phase,
 )
 from integral_tool.io import load_points_from_obj
@@ -36,6 +37,8 @@ def run_demo(method="python", points=None, brightness=None):
         U = fresnel_hologram_scipy(points, amplitude, grid, grid)
     elif method == "cpp":
         U = fresnel_hologram_cpp(points, amplitude, grid, grid)
+    elif method == "numba":
+        U = fresnel_hologram_numba(points, amplitude, grid, grid)
     else:
         raise ValueError(f"Unknown method: {method}")
     duration = time.time() - start
@@ -51,7 +54,7 @@ if __name__ == "__main__":
         "--method",
         type=str,
         default="python",
-        choices=["python", "scipy", "cpp"],
+        choices=["python", "scipy", "cpp", "numba"],
         help="Implementation method to use.",
     )
     parser.add_argument(
@@ -27,6 +27,8 @@ a = Analysis(
     hiddenimports=[
         'integral_tool.cpp_integral_impl',
         'scipy.special._ufuncs_cxx',
+        'numba',
+        'integral_tool.numba_impl',
     ],
     hookspath=[],
     hooksconfig={},
@@ -1,13 +1,27 @@
 import numpy as np
+import pytest
 from integral_tool.integral import (
     point_source_wavefield,
     fresnel_hologram,
     fresnel_hologram_scipy,
     fresnel_hologram_cpp,
+    fresnel_hologram_numba,
     surface_huygens_fresnel,
     amplitude_phase,
+    fresnel_propagate,
+    fraunhofer_propagate,
+    fresnel_hologram_error,
+    layer_hologram,
+    polygon_hologram,
+    octree_hologram,
+    surface_huygens_fresnel_quadrature,
+    reconstruct_focal_stack,
 )
+from integral_tool.fft_impl import angular_spectrum_transfer
 from integral_tool.io import load_points_from_obj
+from integral_tool.polygon_impl import reference_triangle_spectrum
+from integral_tool import reconstruction_impl
+from integral_tool.reconstruction_impl import cached_transfer
 
 
 def test_load_obj():
@@ -23,6 +37,28 @@ def test_load_obj():
     assert np.allclose(points, expected_points)
 
 
+def test_load_obj_faces():
+    """Test loading faces, including fan triangulation of polygons."""
+    points, faces = load_points_from_obj("tests/sample.obj", return_faces=True)
+    assert points.shape == (3, 3)
+    assert faces.dtype == np.int32
+    assert np.array_equal(faces, [[0, 1, 2]])
+
+
+def test_load_obj_face_formats(tmp_path):
+    """Slash and negative indices are accepted, index 0 is malformed."""
+    path = tmp_path / "quad.obj"
+    path.write_text(
+        "v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\n"
+        "f 1/1/1 2/2/1 3/3/1 4/4/1\n"
+        "f -4 -3 -1\n"
+        "f 0 1 2\n"
+    )
+    points, faces = load_points_from_obj(str(path), return_faces=True)
+    assert points.shape == (4, 3)
+    assert np.array_equal(faces, [[0, 1, 2], [0, 2, 3], [0, 1, 3]])
+
+
 def test_hologram_shape():
     points = np.array([[0.0, 0.0, 0.0]])
     brightness = np.array([255.0])
@@ -70,3 +106,382 @@ def test_numerical_consistency():
 
     # The SciPy implementation uses a different integration rule, so the tolerance is looser
     assert np.allclose(U_py, U_scipy, rtol=1e-3, atol=1e-5)
+
+
+def test_numba_matches_python():
+    """Test that the Numba backend agrees with NumPy in double and single precision."""
+    pytest.importorskip("numba")
+    points = np.array([[0.001, 0.002, 0.0], [-0.001, -0.002, 0.003]])
+    amp = point_source_wavefield(points, np.array([200.0, 150.0]))
+    grid = np.linspace(-0.01, 0.01, 5)
+
+    U_py = fresnel_hologram(points, amp, grid, grid)
+    U_nb = fresnel_hologram_numba(points, amp, grid, grid)
+    assert U_nb.dtype == np.complex128
+    assert np.allclose(U_py, U_nb, rtol=1e-8, atol=1e-10)
+
+    # Default demo geometry: float32 storage must not degrade the phase
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-0.01, 0.01, size=(50, 3))
+    amp = point_source_wavefield(points, rng.uniform(0, 255, size=50))
+    grid = np.linspace(-0.05, 0.05, 64)
+    U_py = fresnel_hologram(points, amp, grid, grid)
+    U_f32 = fresnel_hologram_numba(points, amp, grid, grid, dtype=np.float32)
+    assert U_f32.dtype == np.complex64
+    assert np.linalg.norm(U_f32 - U_py) / np.linalg.norm(U_py) < 1e-5
+    # float32 inputs alone do not downcast the result
+    assert fresnel_hologram_numba(points.astype(np.float32), amp, grid, grid).dtype == np.complex128
+
+
+def test_numba_source_on_pixel_is_finite():
+    pytest.importorskip("numba")
+    grid = np.linspace(-0.01, 0.01, 5)
+    points = np.array([[0.0, 0.0, 0.1]])
+    U_nb = fresnel_hologram_numba(points, np.ones(1), grid, grid, z0=0.1)
+    assert np.all(np.isfinite(U_nb))
+    assert np.allclose(U_nb, fresnel_hologram(points, np.ones(1), grid, grid, z0=0.1))
+
+
+def test_numba_jit_without_source_file():
+    """Frozen builds have no source to cache against; compile without the cache."""
+    numba = pytest.importorskip("numba")
+    from integral_tool.numba_impl import _jit
+    namespace = {"prange": numba.prange}
+    source = "def total(x):\n    acc = 0.0\n    for i in prange(x.shape[0]):\n        acc += x[i]\n    return acc\n"
+    exec(compile(source, "/frozen/missing_source.py", "exec"), namespace)
+    assert _jit(namespace["total"])(np.arange(4.0)) == 6.0
+
+
+def _gaussian_source(n=32, half_width=0.5e-3, waist=0.2e-3):
+    xs = np.linspace(-half_width, half_width, n)
+    xg, yg = np.meshgrid(xs, xs, indexing="ij")
+    Us = np.exp(-(xg**2 + yg**2) / waist**2).astype(np.complex128)
+    return Us, xs
+
+
+def test_fresnel_propagate_matches_surface_integral():
+    Us, xs = _gaussian_source()
+    U, gx, gy = fresnel_propagate(Us, xs, xs, z0=0.05)
+    U_exact = surface_huygens_fresnel(Us, xs, xs, gx, gy, z0=0.05)
+    assert U.shape == (32, 32)
+    assert np.linalg.norm(U - U_exact) / np.linalg.norm(U_exact) < 1e-3
+
+
+def test_fresnel_propagate_round_trip():
+    # FFT output grids are centred as (i - n // 2) * du, so start from one too.
+    xs = (np.arange(64) - 32) * 15e-6
+    xg, yg = np.meshgrid(xs, xs, indexing="ij")
+    Us = np.exp(-(xg**2 + yg**2) / (0.1e-3)**2).astype(np.complex128)
+    U, gx, gy = fresnel_propagate(Us, xs, xs, z0=0.05)
+    U_back, gx_back, _ = fresnel_propagate(U, gx, gy, z0=-0.05)
+    assert np.allclose(gx_back, xs)
+    assert np.allclose(U_back, Us, atol=1e-10)
+
+
+def test_fraunhofer_validity_check():
+    Us, xs = _gaussian_source()
+    with pytest.warns(RuntimeWarning):
+        fraunhofer_propagate(Us, xs, xs, z0=0.05)
+    with pytest.warns(RuntimeWarning):
+        U, gx, gy = fraunhofer_propagate(Us, xs, xs, z0=0.05, fallback=True)
+    U_exact = surface_huygens_fresnel(Us, xs, xs, gx, gy, z0=0.05)
+    assert np.allclose(U, U_exact)
+
+    U_far, gx, gy = fraunhofer_propagate(Us, xs, xs, z0=20.0)
+    U_exact = surface_huygens_fresnel(Us, xs, xs, gx, gy, z0=20.0)
+    assert np.linalg.norm(U_far - U_exact) / np.linalg.norm(U_exact) < 1e-2
+
+
+def test_fresnel_validity_uses_field_support():
+    """A 1 mm aperture in a 512^2 window is not judged by the window size."""
+    import warnings
+    from integral_tool.quadrature_impl import weighted_surface_sum
+    xs = (np.arange(512) - 256) * 8e-6
+    xg, yg = np.meshgrid(xs, xs, indexing="ij")
+    Us = ((np.abs(xg) <= 0.5e-3) & (np.abs(yg) <= 0.5e-3)).astype(np.complex128)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        U, gx, gy = fresnel_propagate(Us, xs, xs, z0=0.1)
+
+    # Exact sum over the aperture on every 16th output pixel
+    aperture = slice(*np.flatnonzero(np.abs(xs) <= 0.5e-3)[[0, -1]] + [0, 1])
+    sub = np.arange(0, 512, 16)
+    U_exact = weighted_surface_sum(
+        Us[aperture, aperture] * 8e-6 ** 2, xs[aperture], xs[aperture], gx[sub], gy[sub], z0=0.1
+    )
+    error = np.linalg.norm(U[np.ix_(sub, sub)] - U_exact) / np.linalg.norm(U_exact)
+    assert error < 2e-2
+
+
+def test_fallback_is_tiled(monkeypatch):
+    """The exact fallback never materializes all pixel/source pairs at once."""
+    import integral_tool.quadrature_impl as quadrature_impl
+    monkeypatch.setattr(quadrature_impl, "TILE_ELEMENTS", 4096)
+    Us, xs = _gaussian_source()
+    with pytest.warns(RuntimeWarning):
+        U, gx, gy = fresnel_propagate(Us, xs, xs, z0=0.002, fallback=True)
+    U_exact = surface_huygens_fresnel(Us, xs, xs, gx, gy, z0=0.002)
+    assert np.allclose(U, U_exact)
+
+
+def test_layer_hologram_matches_exact():
+    """Points on pixel centres and layer depths are reproduced exactly."""
+    rng = np.random.default_rng(0)
+    grid = (np.arange(32) - 16) * 8e-6
+    n = 20
+    points = np.column_stack([
+        grid[rng.integers(0, 32, n)],
+        grid[rng.integers(0, 32, n)],
+        rng.choice([0.0, 5e-4, 1e-3], n),
+    ])
+    amp = rng.uniform(0.5, 1.0, n)
+    U = layer_hologram(points, amp, grid, grid, z0=0.05, layer_thickness=5e-4)
+    assert U.shape == (32, 32)
+    assert fresnel_hologram_error(U, points, amp, grid, grid, z0=0.05) < 1e-10
+
+    empty = layer_hologram(np.zeros((0, 3)), np.zeros(0), grid, grid, z0=0.05)
+    assert empty.shape == (32, 32) and not np.any(empty)
+
+
+def test_layer_hologram_depth_quantization():
+    rng = np.random.default_rng(1)
+    grid = (np.arange(32) - 16) * 8e-6
+    n = 20
+    points = np.column_stack([
+        grid[rng.integers(0, 32, n)],
+        grid[rng.integers(0, 32, n)],
+        rng.uniform(0.0, 1e-3, n),
+    ])
+    amp = np.ones(n)
+    coarse = layer_hologram(points, amp, grid, grid, z0=0.05, layer_thickness=1e-4)
+    fine = layer_hologram(points, amp, grid, grid, z0=0.05, layer_thickness=1e-6)
+    err_coarse = fresnel_hologram_error(coarse, points, amp, grid, grid, z0=0.05)
+    err_fine = fresnel_hologram_error(fine, points, amp, grid, grid, z0=0.05, stride=2)
+    assert err_fine < err_coarse < 0.05
+
+
+def test_layer_hologram_off_grid():
+    """Off-pixel points need lateral oversampling, not thinner layers."""
+    rng = np.random.default_rng(2)
+    grid = (np.arange(32) - 16) * 8e-6
+    n = 20
+    points = rng.uniform(-100e-6, 100e-6, (n, 3))
+    amp = np.ones(n)
+    errors = {}
+    for thickness, oversample in [(1e-5, 1), (1e-7, 1), (1e-5, 4)]:
+        U = layer_hologram(points, amp, grid, grid, z0=0.01, layer_thickness=thickness, oversample=oversample)
+        errors[thickness, oversample] = fresnel_hologram_error(U, points, amp, grid, grid, z0=0.01)
+    assert errors[1e-7, 1] > 0.5 * errors[1e-5, 1]
+    assert errors[1e-5, 4] < 0.5 * errors[1e-5, 1]
+
+    # Points on quarter-pixel positions are exact with oversample=4
+    points[:, :2] = grid[0] + np.rint((points[:, :2] - grid[0]) / 2e-6) * 2e-6
+    points[:, 2] = 0.0
+    U = layer_hologram(points, amp, grid, grid, z0=0.01, oversample=4)
+    assert fresnel_hologram_error(U, points, amp, grid, grid, z0=0.01) < 1e-10
+
+
+def test_reference_triangle_spectrum():
+    m = 400
+    u = (np.arange(m) + 0.5) / m
+    ug, wg = np.meshgrid(u, u, indexing="ij")
+    mask = ug + wg < 1
+    for a, b in [(3.0, 5.0), (5.0, 5.0), (0.0, 4.0), (7.0, -3.0)]:
+        numeric = np.sum(np.exp(-1j * (a * ug + b * wg))[mask]) / m**2
+        assert abs(reference_triangle_spectrum(a, b) - numeric) < 5e-3
+    assert np.isclose(reference_triangle_spectrum(0.0, 0.0), 0.5)
+    assert np.isclose(reference_triangle_spectrum(1e-12, 1e-12), 0.5)
+
+
+def test_polygon_hologram_matches_sampled_mesh():
+    grid = (np.arange(32) - 16) * 8e-6
+    vertices = np.array([
+        [-6e-5, -6e-5, 0.0],
+        [8e-5, -3e-5, 1e-6],
+        [0.0, 7e-5, 0.0],
+        [-7e-5, 6e-5, 1e-6],
+    ])
+    faces = np.array([[0, 1, 2], [0, 2, 3]])
+    amp = np.array([1.0, 0.5])
+    U = polygon_hologram(vertices, faces, amp, grid, grid, z0=0.02, pad=4)
+
+    # Reference: centroids of the upright sub-triangles of a K x K subdivision
+    K = 60
+    s, t = np.meshgrid(np.arange(K), np.arange(K), indexing="ij")
+    keep = s + t < K
+    u, w = (s[keep] + 1 / 3) / K, (t[keep] + 1 / 3) / K
+    points, weights = [], []
+    for a, (i, j, k) in zip(amp, faces):
+        v0, e1, e2 = vertices[i], vertices[j] - vertices[i], vertices[k] - vertices[i]
+        area = np.linalg.norm(np.cross(e1, e2)) / 2
+        points.append(v0 + u[:, None] * e1 + w[:, None] * e2)
+        weights.append(np.full(u.size, a * 2 * area / K**2))
+    points, weights = np.concatenate(points), np.concatenate(weights)
+    assert fresnel_hologram_error(U, points, weights, grid, grid, z0=0.02) < 0.05
+
+
+def test_octree_hologram_accuracy():
+    rng = np.random.default_rng(2)
+    points = rng.normal(0.0, 5e-6, size=(400, 3))
+    amp = rng.uniform(0.5, 1.0, 400)
+    grid = (np.arange(32) - 16) * 8e-6
+    U_exact = fresnel_hologram(points, amp, grid, grid, z0=0.05)
+    for tolerance in (1e-2, 1e-4):
+        U, error = octree_hologram(points, amp, grid, grid, z0=0.05, tolerance=tolerance, return_error=True)
+        assert U.shape == (32, 32)
+        assert np.linalg.norm(U - U_exact) / np.linalg.norm(U_exact) < tolerance
+        assert error < tolerance
+
+
+def test_octree_hologram_expands_at_scene_scale(monkeypatch):
+    """A 1 mm cloud at 0.1 m is expanded, not summed point by point."""
+    import integral_tool.octree_impl as octree_impl
+    calls = []
+    expand_tile = octree_impl._expand_tile
+
+    def counting_expand_tile(*args):
+        calls.append(len(args[2]))
+        return expand_tile(*args)
+
+    monkeypatch.setattr(octree_impl, "_expand_tile", counting_expand_tile)
+    rng = np.random.default_rng(3)
+    points = rng.uniform(-0.5e-3, 0.5e-3, size=(4000, 3))
+    amp = rng.uniform(0.5, 1.0, 4000)
+    grid = (np.arange(64) - 32) * 8e-6
+
+    U = octree_hologram(points, amp, grid, grid, z0=0.1, tolerance=1e-2)
+    assert sum(calls) > 0
+    assert fresnel_hologram_error(U, points, amp, grid, grid, z0=0.1) < 1e-2
+
+
+def test_octree_hologram_is_blocked(monkeypatch):
+    """Small blocks of points give the same field as one block per tile."""
+    import integral_tool.octree_impl as octree_impl
+    rng = np.random.default_rng(4)
+    points = rng.uniform(-0.5e-3, 0.5e-3, size=(3000, 3))
+    amp = rng.uniform(0.5, 1.0, 3000)
+    grid = (np.arange(32) - 16) * 8e-6
+    U = octree_hologram(points, amp, grid, grid, z0=0.1, tolerance=1e-2)
+
+    chunks = []
+    segment_chunks = octree_impl._segment_chunks
+
+    def recording_segment_chunks(start, stop, size):
+        sizes = [idx.size for idx, _ in segment_chunks(start, stop, size)]
+        chunks.append(sizes)
+        return segment_chunks(start, stop, size)
+
+    monkeypatch.setattr(octree_impl, "BLOCK_ELEMENTS", 1024)
+    monkeypatch.setattr(octree_impl, "_segment_chunks", recording_segment_chunks)
+    U_blocked = octree_hologram(points, amp, grid, grid, z0=0.1, tolerance=1e-2)
+    assert np.allclose(U_blocked, U, rtol=1e-10, atol=0)
+    assert max(len(sizes) for sizes in chunks) > 1
+    assert max(max(sizes) for sizes in chunks) <= 1024
+
+
+def test_quadrature_matches_surface_integral():
+    """Gauss-Legendre needs far fewer source nodes than the rectangle rule."""
+    def source(x, y):
+        return (1 + 0.5 * np.cos(x / 1e-4)).astype(np.complex128)
+
+    bounds = (-2e-4, 2e-4)
+    grid = np.linspace(-3e-4, 3e-4, 6)
+    reference = surface_huygens_fresnel_quadrature(source, bounds, bounds, grid, grid, z0=0.05, n=(64, 64))
+
+    U, estimate = surface_huygens_fresnel_quadrature(
+        source, bounds, bounds, grid, grid, z0=0.05, n=(17, 17), return_error=True
+    )
+    error = np.linalg.norm(U - reference) / np.linalg.norm(reference)
+    assert error < 1e-4
+    assert estimate > error
+
+    xs = np.linspace(*bounds, 65)
+    xg, yg = np.meshgrid(xs, xs, indexing="ij")
+    U_rect = surface_huygens_fresnel(source(xg, yg), xs, xs, grid, grid, z0=0.05)
+    assert np.linalg.norm(U_rect - reference) / np.linalg.norm(reference) > error
+
+    U_simpson = surface_huygens_fresnel_quadrature(
+        source, bounds, bounds, grid, grid, z0=0.05, n=(65, 65), rule="simpson"
+    )
+    assert np.linalg.norm(U_simpson - reference) / np.linalg.norm(reference) < 1e-3
+
+    # The smallest rules have no coarser rule to estimate the error with
+    for rule, nodes in (("gauss", (1, 8)), ("simpson", (9, 3))):
+        with pytest.raises(ValueError):
+            surface_huygens_fresnel_quadrature(
+                source, bounds, bounds, grid, grid, z0=0.05, n=nodes, rule=rule, return_error=True
+            )
+    _, estimate = surface_huygens_fresnel_quadrature(
+        source, bounds, bounds, grid, grid, z0=0.05, n=(5, 5), rule="simpson", return_error=True
+    )
+    assert estimate > 0
+
+
+def test_focal_stack_refocuses_point(tmp_path):
+    grid = (np.arange(64) - 32) * 8e-6
+    points = np.array([[grid[20], grid[40], 0.0]])
+    U = fresnel_hologram(points, np.ones(1), grid, grid, z0=0.02)
+    z_values = np.linspace(-0.03, -0.01, 11)
+
+    cached_transfer.cache_clear()
+    stack = reconstruct_focal_stack(U, grid, grid, z_values)
+    assert stack.shape == (11, 64, 64)
+    best = np.argmax(stack.reshape(len(z_values), -1).max(axis=1))
+    assert np.isclose(z_values[best], -0.02)
+    assert np.unravel_index(np.argmax(stack[best]), stack[best].shape) == (20, 40)
+
+    streamed = reconstruct_focal_stack(U, grid, grid, z_values, output=str(tmp_path / "stack.npy"))
+    assert cached_transfer.cache_info().hits == len(z_values)
+    assert np.allclose(np.load(tmp_path / "stack.npy"), stack)
+    assert np.allclose(streamed, stack)
+
+
+def test_focal_stack_repeated_long_sweep(monkeypatch):
+    """Repeated sweeps hit the cache even when they exceed its size."""
+    grid = (np.arange(32) - 16) * 8e-6
+    U = fresnel_hologram(np.array([[0.0, 0.0, 0.0]]), np.ones(1), grid, grid, z0=0.02)
+    z_values = np.linspace(-0.03, -0.01, 40)
+    entry = 32 * 32 * np.dtype(np.complex128).itemsize
+
+    cached_transfer.cache_clear()
+    reconstruct_focal_stack(U, grid, grid, z_values)
+    reconstruct_focal_stack(U, grid, grid, z_values)
+    info = cached_transfer.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (40, 40, 40 * entry)
+
+    # A cache for 10 planes keeps its 10 planes instead of thrashing
+    monkeypatch.setattr(cached_transfer, "maxsize", 10 * entry)
+    cached_transfer.cache_clear()
+    for _ in range(3):
+        reconstruct_focal_stack(U, grid, grid, z_values)
+    info = cached_transfer.cache_info()
+    assert (info.hits, info.misses) == (20, 100)
+    assert info.currsize <= info.maxsize
+    cached_transfer.cache_clear()
+
+
+def test_focal_stack_steps_transfer_functions(monkeypatch):
+    """Misses reuse kz per grid and step the phase between planes."""
+    calls = []
+    kz = reconstruction_impl._angular_spectrum_kz
+    monkeypatch.setattr(
+        reconstruction_impl, "_angular_spectrum_kz", lambda *grid: calls.append(grid) or kz(*grid)
+    )
+    cached_transfer.cache_clear()
+    z_values = list(np.linspace(-0.1, -0.05, 50)) + [0.02, -0.07, 0.3]
+    for z in z_values:
+        H = cached_transfer(128, 96, 8e-6, 6e-6, 532e-9, z)
+        assert np.allclose(H, angular_spectrum_transfer(128, 96, 8e-6, 6e-6, 532e-9, z), rtol=0, atol=1e-6)
+    assert len(calls) == 1
+    cached_transfer.cache_clear()
+
+    grid = (np.arange(64) - 32) * 8e-6
+    U = fresnel_hologram(np.array([[grid[20], grid[40], 0.0]]), np.ones(1), grid, grid, z0=0.02)
+    z_values = np.linspace(-0.03, -0.01, 11)
+    stack = reconstruct_focal_stack(U, grid, grid, z_values)
+    single = reconstruct_focal_stack(U, grid, grid, z_values, dtype=np.float32)
+    assert single.dtype == np.float32
+    assert np.allclose(single, stack, rtol=0, atol=1e-5 * stack.max())
+    with pytest.raises(ValueError):
+        reconstruct_focal_stack(U, grid, grid, z_values, dtype=np.int32)
+    cached_transfer.cache_clear()